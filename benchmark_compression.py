@@ -0,0 +1,152 @@
+import sys
+import time
+import zlib
+import pickle
+
+from verify_location import (get_cache_index, package_results,
+                             COMPRESS_MIN_BYTES)
+
+# Number of most common location names to benchmark.
+TOP_NAMES = 200
+
+# Link speeds (Mbit/s) used to estimate transfer time saved.
+LINK_MBPS = [10, 100, 1000]
+
+# Timing repetitions per reply.
+REPEAT = 20
+
+# Max zlib preset dictionary size (bytes).
+ZDICT_SIZE = 32 * 1024
+
+
+def time_call(func, *args):
+    """
+    Returns the average run time (seconds)
+    of func(*args) over REPEAT calls.
+    """
+
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        func(*args)
+
+    return (time.perf_counter() - start) / REPEAT
+
+
+def zlib_compress(data, level, zdict=None):
+    """
+    Compresses data w/ zlib (optional preset dictionary).
+    """
+
+    if zdict:
+        comp = zlib.compressobj(level=level, zdict=zdict)
+    else:
+        comp = zlib.compressobj(level=level)
+
+    return comp.compress(data) + comp.flush()
+
+
+def zlib_decompress(data, zdict=None):
+    """
+    Decompresses data w/ zlib (optional preset dictionary).
+    """
+
+    if zdict:
+        return zlib.decompressobj(zdict=zdict).decompress(data)
+
+    return zlib.decompress(data)
+
+
+def build_replies():
+    """
+    Builds the pickled query replies for the most
+    common location names in the local API cache.
+    """
+
+    names = get_cache_index()['names']
+    common = sorted(names, key=lambda n: len(names[n]), reverse=True)
+
+    return [pickle.dumps(package_results(names[n]))
+            for n in common[:TOP_NAMES]]
+
+
+def build_sample_zdict(samples):
+    """
+    Builds a candidate zlib preset dictionary from
+    sample replies (last ZDICT_SIZE bytes of the
+    samples joined; zlib favors recent data).
+    """
+
+    return b"".join(samples)[-ZDICT_SIZE:]
+
+
+def benchmark(replies):
+    """
+    Prints bytes saved vs compress/decompress CPU
+    cost for each zlib setting over the replies the
+    microservice would compress (>= COMPRESS_MIN_BYTES).
+
+    Even-indexed replies train a sample dictionary;
+    all settings are measured on the odd-indexed ones
+    so the dictionary is never tested on its samples.
+    NOTE: The microservice uses plain zlib; '+dict'
+    rows show whether a shared dictionary would pay off.
+    """
+
+    zdict = build_sample_zdict(replies[0::2])
+    replies = replies[1::2]
+
+    large = [r for r in replies if len(r) >= COMPRESS_MIN_BYTES]
+    raw_bytes = sum(len(r) for r in large)
+
+    print(f"Replies: {len(replies)}")
+    print(f"Replies >= {COMPRESS_MIN_BYTES} bytes: {len(large)} "
+          f"({raw_bytes} bytes raw)")
+    print("")
+
+    # Error: Nothing the microservice would compress.
+    if not large:
+        print("! - No replies to benchmark (try more names) - !")
+        return
+
+    replies = large
+
+    header = f"{'setting':<16}{'bytes':>10}{'ratio':>8}"
+    header += f"{'comp ms':>10}{'decomp ms':>11}"
+    for mbps in LINK_MBPS:
+        header += f"{f'net {mbps}M ms':>14}"
+    print(header)
+
+    for level in [1, 6, 9]:
+        for zd in [None, zdict]:
+            name = f"zlib-{level}" + ("+dict" if zd else "")
+
+            comp_s = 0
+            decomp_s = 0
+            comp_bytes = 0
+
+            for r in replies:
+                c = zlib_compress(r, level, zd)
+                comp_bytes += len(c)
+                comp_s += time_call(zlib_compress, r, level, zd)
+                decomp_s += time_call(zlib_decompress, c, zd)
+
+            row = f"{name:<16}{comp_bytes:>10}"
+            row += f"{comp_bytes / raw_bytes:>8.2f}"
+            row += f"{comp_s * 1000:>10.2f}{decomp_s * 1000:>11.2f}"
+
+            # Transfer time saved minus CPU spent (+ -> net win).
+            saved_bits = (raw_bytes - comp_bytes) * 8
+            for mbps in LINK_MBPS:
+                net_s = saved_bits / (mbps * 1e6) - comp_s - decomp_s
+                row += f"{net_s * 1000:>14.2f}"
+
+            print(row)
+
+
+if __name__ == "__main__":
+
+    # Optional: override number of names benchmarked.
+    if len(sys.argv) > 1:
+        TOP_NAMES = int(sys.argv[1])
+
+    benchmark(build_replies())
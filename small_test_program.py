@@ -1,8 +1,11 @@
 
 # REQUIRED (NOTE: Necessary for microservice communication.)
 import zmq
+import zlib
+import time
 import pickle
 import requests
+from concurrent.futures import ThreadPoolExecutor
 
 from dotenv import load_dotenv  # Used to access API securely.
 
@@ -11,6 +14,29 @@ from dotenv import load_dotenv  # Used to access API securely.
 import platform
 import os
 
+# Seconds the microservice has to answer a query before
+# the query is considered stale (dropped / shed as 'busy').
+REQUEST_TIMEOUT = 10
+
+# Weather API request settings.
+WEATHER_BASE_URL = "http://api.openweathermap.org/data/2.5/weather?"
+WEATHER_UNITS = 'imperial'
+WEATHER_TIMEOUT = 10
+
+# Fetch weather for displayed location options while the
+# user is still choosing (max concurrent API requests).
+# NOTE: Off by default - costs up to 3 extra API calls per list.
+PREFETCH_WEATHER = False
+WEATHER_MAX_WORKERS = 3
+
+# Background weather requests -> {location id: Future}.
+weather_pool = None
+weather_prefetch = {}
+
+# Reply compression accepted from the microservice (None -> off).
+REPLY_ENCODING = 'zlib'
+ZLIB_PREFIX = b'z'
+
 
 def clear_terminal():
     """
@@ -38,6 +64,121 @@ def terminate_zmq(socket, context):
     context.term()
 
 
+def decode_reply(raw):
+    """
+    Decompresses a microservice reply if it
+    was sent compressed (see REPLY_ENCODING).
+    """
+
+    if raw[:1] != ZLIB_PREFIX:
+        return raw
+
+    return zlib.decompress(raw[1:])
+
+
+def send_query(push_socket, pull_socket, query_type, contents):
+    """
+    Sends a query (w/ deadline) to the microservice
+    and returns its reply. Returns 'busy' if the
+    microservice shed the query or missed its deadline.
+    """
+
+    deadline = time.time() + REQUEST_TIMEOUT
+    query = [query_type, contents, deadline, REPLY_ENCODING]
+    push_socket.send(pickle.dumps(query))
+
+    # Expired queries are dropped without a reply.
+    if pull_socket.poll(REQUEST_TIMEOUT * 1000):
+        return pickle.loads(decode_reply(pull_socket.recv()))
+
+    return 'busy'
+
+
+def fetch_weather(loc):
+    """
+    Requests current weather for a location
+    (dict -> lat/lon, int -> US zip code).
+    """
+
+    _api_key = os.getenv("WEATHER_API_KEY")
+    u = WEATHER_UNITS
+
+    # Build URL from ZIP.
+    if isinstance(loc, int):
+        query = f"zip={loc},us"
+
+    # Build URL from lat/lon:
+    else:
+        query = f"lat={loc['coord']['lat']}&lon={loc['coord']['lon']}"
+
+    url = f"{WEATHER_BASE_URL}appid={_api_key}&{query}&units={u}"
+
+    # Network errors are reported like API errors.
+    try:
+        return requests.get(url, timeout=WEATHER_TIMEOUT).json()
+    except (requests.RequestException, ValueError) as e:
+        return {'cod': 'error', 'message': str(e)}
+
+
+def fetch_weather_batch(locs, max_workers=WEATHER_MAX_WORKERS):
+    """
+    Fetches weather for many resolved locations in
+    parallel (at most max_workers requests at once).
+    Results are returned in the same order as locs.
+    """
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(fetch_weather, locs))
+
+
+def prefetch_weather(locs):
+    """
+    Starts background weather requests for
+    location options shown to the user.
+    """
+
+    global weather_pool
+
+    if weather_pool is None:
+        weather_pool = ThreadPoolExecutor(max_workers=WEATHER_MAX_WORKERS)
+
+    for loc in locs:
+        if loc['id'] not in weather_prefetch:
+            future = weather_pool.submit(fetch_weather, loc)
+            weather_prefetch[loc['id']] = future
+
+
+def cancel_prefetched_weather():
+    """
+    Cancels & forgets all prefetched weather requests.
+    """
+
+    # NOTE: Requests already in flight can't be cancelled;
+    # their results are simply discarded.
+    for future in weather_prefetch.values():
+        future.cancel()
+    weather_prefetch.clear()
+
+
+def take_prefetched_weather(loc):
+    """
+    Returns prefetched weather for the user's chosen
+    location (None if not prefetched) and cancels
+    requests for the other options.
+    """
+
+    picked = None
+    if isinstance(loc, dict):
+        picked = weather_prefetch.pop(loc['id'], None)
+
+    cancel_prefetched_weather()
+
+    if picked is None:
+        return None
+
+    return picked.result()
+
+
 def header_msg():
     """
     Prints header message
@@ -145,13 +286,15 @@ def main_test():
 
         # Get API info:
         load_dotenv()
-        _api_key = os.getenv("WEATHER_API_KEY")
-        _base_url = "http://api.openweathermap.org/data/2.5/weather?"
-        u = 'imperial'
 
         # Get loc info via microservice.
         loc = get_location()
 
+        # Use prefetched weather (if any) /OR/ request it now.
+        wd = take_prefetched_weather(loc)
+        if wd is None:
+            wd = fetch_weather(loc)
+
         # Clear interface.
         clear_terminal()
         header_msg()
@@ -159,11 +302,6 @@ def main_test():
         # Case 1: User input ZIP of location:
         if isinstance(loc, int):
 
-            # Build URL from ZIP.
-            url = f"{_base_url}appid={_api_key}&zip={loc},us&units={u}"
-            res = requests.get(url)
-            wd = res.json()
-
             # Check 'good' API response:
             if wd['cod'] == 200:
                 print(f"Weather for area code {loc}:")
@@ -181,14 +319,6 @@ def main_test():
         # Case 2: User filtered down location:
         else:
 
-            # Build URL from lat/lon:
-            lat = loc['coord']['lat']
-            lon = loc['coord']['lon']
-            url = f"{_base_url}appid={_api_key}&lat={lat}&lon={lon}&units={u}"
-
-            res = requests.get(url)
-            wd = res.json()
-
             # Check if 'good' API response:
             if wd['cod'] == 200:
                 n = loc['name']
@@ -291,13 +421,15 @@ def handle_single_match(msg, push_socket, pull_socket,
             # API handles US-based zipcodes natively.
             # That information isn't present in the JSON
             # cache file that this microservice is based around.
-            push_socket.send(pickle.dumps(['zip', zip_code]))
-            zip_msg = pickle.loads(pull_socket.recv())
+            zip_msg = send_query(push_socket, pull_socket, 'zip', zip_code)
 
-            # Handle user input err.
-            if zip_msg == 'error':
+            # Handle user input err / busy microservice.
+            if zip_msg in ['error', 'busy']:
                 print("")
-                print("! - Invalid Input - !")
+                if zip_msg == 'busy':
+                    print("! - Service busy, try again - !")
+                else:
+                    print("! - Invalid Input - !")
                 print("")
                 input("Press enter to continue...")
 
@@ -357,6 +489,9 @@ def get_location():
     clear_terminal()
     header_msg()
 
+    # Drop stale prefetches from an abandoned search.
+    cancel_prefetched_weather()
+
     # Establish ZMQ PUSH pipe:
     push_context = zmq.Context()
     push_socket = push_context.socket(zmq.PUSH)
@@ -371,13 +506,15 @@ def get_location():
     city_town_name = input("City/Town: ").lower()
 
     # Send query to microservice:
-    push_socket.send(pickle.dumps(['query', city_town_name]))
-    msg = pickle.loads(pull_socket.recv())
+    msg = send_query(push_socket, pull_socket, 'query', city_town_name)
 
-    # Handle user input err...
-    if msg == 'error':
+    # Handle user input err / busy microservice...
+    if msg in ['error', 'busy']:
         print("")
-        print(f"Error: No location matching {city_town_name} identified.")
+        if msg == 'busy':
+            print("! - Service busy, try again - !")
+        else:
+            print(f"Error: No location matching {city_town_name} identified.")
         print("")
         input("Press enter to continue...")
 
@@ -408,6 +545,10 @@ def get_location():
                 clear_terminal()
                 header_msg()
 
+                # Start fetching weather for the options shown.
+                if PREFETCH_WEATHER:
+                    prefetch_weather(msg[3][:3])
+
                 # Draw found match count msg to terminal.
                 print(f"! - {msg[2]} matches found - !")
                 print("")
@@ -427,17 +568,20 @@ def get_location():
                 if inp in ['Filter', 'filter', 'Filters', 'filters', 'F', 'f']:
 
                     # Get additional filter information from user:
-                    fd = ['filter_query', get_filter_input(city_town_name)]
+                    fd = get_filter_input(city_town_name)
 
                     # Send info to microservice to parse through
                     # the Weather API local cache.
-                    push_socket.send(pickle.dumps(fd))
-                    msg = pickle.loads(pull_socket.recv())
+                    msg = send_query(push_socket, pull_socket,
+                                     'filter_query', fd)
 
-                    # Handle user err or no match case:
-                    if msg == "error":
+                    # Handle user err, no match or busy case:
+                    if msg in ["error", "busy"]:
                         print("")
-                        print("! - Invalid filter /OR/ No match - !")
+                        if msg == "busy":
+                            print("! - Service busy, try again - !")
+                        else:
+                            print("! - Invalid filter /OR/ No match - !")
                         print("")
                         input("Press enter to continue...")
 
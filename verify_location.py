@@ -1,10 +1,65 @@
 import os
 import zmq
+import zlib
 import json
 import gzip
+import time
 import pickle
+import pstats
+import cProfile
 import shutil
+import threading
 import urllib.request
+from functools import lru_cache
+from collections import deque
+
+# Weather API location cache source & local copy.
+WAPI_CACHE_URL = 'https://bulk.openweathermap.org/sample/city.list.json.gz'
+WAPI_CACHE_PATH = 'weatherapi_cache/city.list.json'
+
+# Admission control settings (override via environment).
+# HWM -> max messages ZMQ buffers per socket before blocking/dropping.
+RCV_HWM = int(os.getenv('VL_RCV_HWM', '100'))
+SND_HWM = int(os.getenv('VL_SND_HWM', '100'))
+
+# Max requests held for processing before replying 'busy'.
+WORK_QUEUE_SIZE = int(os.getenv('VL_WORK_QUEUE_SIZE', '32'))
+
+# Max pre-pickled replies kept for repeat queries.
+REPLY_CACHE_SIZE = int(os.getenv('VL_REPLY_CACHE_SIZE', '1024'))
+
+# Reply compression (negotiated per query, see README).
+# Replies under COMPRESS_MIN_BYTES are always sent as-is.
+COMPRESS_MIN_BYTES = int(os.getenv('VL_COMPRESS_MIN_BYTES', '1024'))
+ZLIB_PREFIX = b'z'
+
+# On-demand profiling settings (see ['profile', seconds]).
+PROFILE_DIR = os.getenv('VL_PROFILE_DIR', 'profiles')
+PROFILE_MAX_SECONDS = 300
+PROFILE_TOP_N = 15
+
+# Active profiling window -> {'profiler', 'end', 'path'} or None.
+active_profile = None
+
+# Background cache refresh -> {'thread', 'base', 'result'} or None.
+# Service loop checks for completion every REFRESH_POLL_MS.
+active_refresh = None
+REFRESH_POLL_MS = 200
+
+# Resident location index (built once from the API cache).
+# 'ids'   -> {location id: (location data, display string)}
+# 'names' -> {name.lower(): [(location data, display string), ...]}
+cache_index = None
+
+# Running counters for the admission control loop.
+service_stats = {
+    'queue_depth': 0,
+    'served': 0,
+    'shed_busy': 0,
+    'shed_expired': 0,
+    'last_refresh': None,
+    'last_profile': None
+}
 
 
 def init_listener():
@@ -15,12 +70,28 @@ def init_listener():
 
     context = zmq.Context()
     socket = context.socket(zmq.PULL)
+    socket.setsockopt(zmq.RCVHWM, RCV_HWM)
 
     socket.connect("tcp://localhost:5555")
     print("!...Initialized listener...!")
     return context, socket
 
 
+def init_sender():
+    """
+    Creates a reply communication pipe using
+    PyZMQ to send results to main program.
+    """
+
+    context = zmq.Context()
+    socket = context.socket(zmq.PUSH)
+    socket.setsockopt(zmq.SNDHWM, SND_HWM)
+
+    socket.bind("tcp://*:5556")
+    print("!...Initialized sender...!")
+    return context, socket
+
+
 def terminate_zmq(socket, context):
     """
     Terminates the communication pipe b/t location
@@ -40,7 +111,7 @@ def download_wapi_cache():
     General SRC: https://bulk.openweathermap.org/sample/
     """
 
-    url = 'https://bulk.openweathermap.org/sample/city.list.json.gz'
+    url = WAPI_CACHE_URL
 
     # Checks if relative path exists.
     if not os.path.exists('weatherapi_cache'):
@@ -54,7 +125,7 @@ def download_wapi_cache():
 
     # Unzip file contents to cache repository.
     with gzip.open('city.list.json.gz', 'rb') as gz:
-        path = 'weatherapi_cache/city.list.json'
+        path = WAPI_CACHE_PATH
         with open(path, 'wb') as gz_copy:
             shutil.copyfileobj(gz, gz_copy)
 
@@ -66,23 +137,499 @@ def download_wapi_cache():
     return msg
 
 
-def receive_user_query(socket):
+def start_cache_refresh():
+    """
+    Starts a cache refresh (download, unzip, parse &
+    diff) on a background thread so queries keep being
+    served. The new index is swapped in by the service
+    loop (see finish_cache_refresh).
+
+    Returns 'success' or 'error' (no local cache /
+    refresh already running).
+    """
+
+    global active_refresh
+
+    # Error: No cache to refresh (use 'cache_dl').
+    if active_refresh or not os.path.isfile(WAPI_CACHE_PATH):
+        return 'error'
+
+    refresh = {'base': get_cache_index(), 'result': 'error'}
+    refresh['thread'] = threading.Thread(target=fetch_cache_delta,
+                                         args=(refresh,), daemon=True)
+    active_refresh = refresh
+    refresh['thread'].start()
+
+    print("!...Cache refresh started...!")
+    return 'success'
+
+
+def fetch_cache_delta(refresh):
+    """
+    (Background thread) Re-downloads the Weather API
+    location cache next to the current one & diffs it
+    against refresh['base']. Stores (new index, counts)
+    or 'error' in refresh['result'].
+
+    Never touches the resident index.
+    """
+
+    gz_path = WAPI_CACHE_PATH + '.gz'
+    tmp_path = WAPI_CACHE_PATH + '.new'
+
+    try:
+        urllib.request.urlretrieve(WAPI_CACHE_URL, gz_path)
+
+        # Unzip alongside (not over) the current cache.
+        with gzip.open(gz_path, 'rb') as gz:
+            with open(tmp_path, 'wb') as gz_copy:
+                shutil.copyfileobj(gz, gz_copy)
+
+        with open(tmp_path, 'r', encoding='utf-8') as cache:
+            loc_data = json.load(cache)
+
+        refresh['result'] = apply_cache_delta(refresh['base'], loc_data)
+
+    # Error: Download / unzip / parse failed or malformed record.
+    except (OSError, EOFError, ValueError, KeyError, TypeError) as e:
+        print(f"!...Cache refresh failed: {e!r}...!")
+
+    finally:
+        remove_file(gz_path)
+
+        # Keep unzipped copy only for the swap.
+        if refresh['result'] == 'error':
+            remove_file(tmp_path)
+
+
+def finish_cache_refresh():
+    """
+    Swaps in the result of a finished background
+    refresh. File & index are swapped together, so
+    queries only ever see the old or new index.
+    """
+
+    global active_refresh
+
+    if not active_refresh or active_refresh['thread'].is_alive():
+        return
+
+    refresh = active_refresh
+    active_refresh = None
+    tmp_path = WAPI_CACHE_PATH + '.new'
+
+    # Error: Refresh failed /OR/ index was replaced meanwhile.
+    if refresh['result'] == 'error' or cache_index is not refresh['base']:
+        remove_file(tmp_path)
+        service_stats['last_refresh'] = 'error'
+        return
+
+    index, counts = refresh['result']
+
+    # Error: Cache file couldn't be replaced (keep old index).
+    try:
+        os.replace(tmp_path, WAPI_CACHE_PATH)
+    except OSError as e:
+        print(f"!...Cache refresh failed: {e!r}...!")
+        remove_file(tmp_path)
+        service_stats['last_refresh'] = 'error'
+        return
+
+    reset_cache_index(index)
+
+    service_stats['last_refresh'] = counts
+    print(f"!...Cache refreshed {counts}...!")
+
+
+def remove_file(path):
+    """
+    Removes a (temporary) file if it exists.
+    """
+
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def receive_user_query(socket, flags=0):
     """
     Receives user query information and returns
     it for use in location verification microservice.
+
+    Raises zmq.Again if flags=zmq.NOBLOCK and
+    no query is pending.
     """
 
-    print("!...Waiting for User Query...!")
-    user_query = pickle.loads(socket.recv())
+    user_query = pickle.loads(socket.recv(flags))
 
     print(f"Received {user_query}")
     return user_query
 
 
+def request_expired(user_query):
+    """
+    Checks whether a query's (optional) deadline
+    has passed. Deadline is a UNIX timestamp
+    stored at index 2 of the query list.
+
+    NOTE: Compared against this host's clock, so
+    clients must share (or sync) the same clock.
+    """
+
+    if not isinstance(user_query, list) or len(user_query) < 3:
+        return False
+
+    deadline = user_query[2]
+
+    # Non-numeric deadline -> treat as no deadline.
+    if isinstance(deadline, bool) or not isinstance(deadline, (int, float)):
+        return False
+
+    return time.time() > deadline
+
+
+def send_nowait(socket, msg):
+    """
+    Sends a reply without blocking the service loop.
+    The reply is dropped if the reply pipe is full
+    (SNDHWM reached) or no peer is connected.
+    """
+
+    try:
+        socket.send(pickle.dumps(msg), zmq.NOBLOCK)
+    except zmq.Again:
+        pass
+
+
+def send_busy(socket):
+    """
+    Sends a fast 'busy' reply without blocking
+    the service loop if the reply pipe is full.
+    """
+
+    send_nowait(socket, 'busy')
+
+
+def start_profile(seconds):
+    """
+    Enables cProfile for a window of `seconds`.
+    Returns the planned .prof path, or 'error' on
+    invalid input / if a window is already active.
+    """
+
+    global active_profile
+
+    try:
+        seconds = float(seconds)
+    except (TypeError, ValueError):
+        return 'error'
+
+    if active_profile or not 0 < seconds <= PROFILE_MAX_SECONDS:
+        return 'error'
+
+    now = time.time()
+    path = os.path.join(PROFILE_DIR, f"profile_{int(now)}.prof")
+
+    profiler = cProfile.Profile()
+    active_profile = {
+        'profiler': profiler,
+        'end': now + seconds,
+        'path': path
+    }
+    profiler.enable()
+
+    print(f"!...Profiling for {seconds}s -> {path}...!")
+    return path
+
+
+def profile_poll_timeout():
+    """
+    Returns ms until the active profiling window
+    ends (None -> block until next query).
+    """
+
+    if not active_profile:
+        return None
+
+    return max(0, int((active_profile['end'] - time.time()) * 1000))
+
+
+def loop_poll_timeout():
+    """
+    Returns ms the service loop may wait for a query
+    before checking profiling / refresh progress
+    (None -> block until next query).
+    """
+
+    timeout = profile_poll_timeout()
+
+    if active_refresh:
+        if timeout is None or timeout > REFRESH_POLL_MS:
+            timeout = REFRESH_POLL_MS
+
+    return timeout
+
+
+def finish_profile():
+    """
+    Ends an elapsed profiling window & writes the
+    stats (.prof) plus a summary of top functions
+    (.prof.txt) to PROFILE_DIR. The summary is also
+    kept as 'last_profile' in the ['stats'] reply.
+    """
+
+    global active_profile
+
+    if not active_profile or time.time() < active_profile['end']:
+        return
+
+    profiler = active_profile['profiler']
+    path = active_profile['path']
+    profiler.disable()
+    active_profile = None
+
+    # Write full stats (viewable w/ pstats / snakeviz).
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profiler.dump_stats(path)
+
+    # Summarize by cumulative time.
+    stats = pstats.Stats(profiler).stats
+    ranked = sorted(stats.items(), key=lambda kv: kv[1][3], reverse=True)
+
+    top = []
+    for (file, line, func), (_, calls, tot, cum, _) in ranked[:PROFILE_TOP_N]:
+        top.append(f"{func} ({os.path.basename(file)}:{line}) "
+                   f"calls={calls} tot={tot:.4f}s cum={cum:.4f}s")
+
+    with open(path + '.txt', 'w', encoding='utf-8') as summary:
+        summary.write('\n'.join(top) + '\n')
+
+    service_stats['last_profile'] = {'profile': path, 'top': top}
+
+    print(f"!...Profile written to {path}...!")
+    for line in top:
+        print(line)
+
+
+def reply_encoding(user_query):
+    """
+    Returns the reply encoding a query accepts
+    ('zlib') stored at index 3 of the query list,
+    or None for uncompressed replies. Any other
+    value is treated as None.
+    """
+
+    if not isinstance(user_query, list) or len(user_query) < 4:
+        return None
+
+    return 'zlib' if user_query[3] == 'zlib' else None
+
+
+def encode_reply(reply, encoding):
+    """
+    Compresses a pickled reply w/ zlib if the
+    query accepts it and the reply is at least
+    COMPRESS_MIN_BYTES long. Pickled replies never
+    start w/ ZLIB_PREFIX, so clients can tell them apart.
+    """
+
+    if encoding != 'zlib' or len(reply) < COMPRESS_MIN_BYTES:
+        return reply
+
+    return ZLIB_PREFIX + zlib.compress(reply)
+
+
+def admit_requests(socket, reply_socket, work_queue):
+    """
+    Drains pending requests from the listener into
+    the bounded work queue. Expired requests are
+    dropped & overflow is shed with a 'busy' reply.
+
+    Returns 'Q' if a quit request was received.
+    """
+
+    while True:
+
+        # Stop once the listener has nothing pending.
+        try:
+            uq = receive_user_query(socket, zmq.NOBLOCK)
+        except zmq.Again:
+            return None
+
+        # Quit (handled immediately).
+        if uq == "Q":
+            return uq
+
+        # Report queue depth & shed counts.
+        if isinstance(uq, list) and uq and uq[0] == 'stats':
+            send_nowait(reply_socket, dict(service_stats))
+            continue
+
+        # Start profiling window (stats written once it ends).
+        if isinstance(uq, list) and uq and uq[0] == 'profile':
+            seconds = uq[1] if len(uq) > 1 else None
+            res = start_profile(seconds)
+
+            if res == 'error':
+                send_nowait(reply_socket, 'error')
+            else:
+                send_nowait(reply_socket, ['success', res])
+            continue
+
+        # Client already gave up -> no reply.
+        if request_expired(uq):
+            service_stats['shed_expired'] += 1
+            continue
+
+        # Queue full -> shed load.
+        if len(work_queue) >= WORK_QUEUE_SIZE:
+            service_stats['shed_busy'] += 1
+            send_busy(reply_socket)
+            continue
+
+        work_queue.append(uq)
+        service_stats['queue_depth'] = len(work_queue)
+
+
+def build_index_entry(loc):
+    """
+    Pairs an API cache location with
+    its precomputed display string.
+    """
+
+    n = loc['name']
+    c = loc['country']
+
+    if loc.get('state'):
+        return loc, f"{n}, {loc['state']}, ({c})"
+
+    return loc, f"{n}, ({c})"
+
+
+def build_cache_index(loc_data):
+    """
+    Indexes API cache locations by id & lowercase
+    name w/ precomputed display strings.
+    """
+
+    ids = {}
+    names = {}
+
+    for loc in loc_data:
+        entry = build_index_entry(loc)
+        ids[loc['id']] = entry
+        names.setdefault(loc['name'].lower(), []).append(entry)
+
+    return {'ids': ids, 'names': names}
+
+
+def apply_cache_delta(index, loc_data):
+    """
+    Diffs a new API cache location list against the
+    resident index by id. Returns a new index (unchanged
+    entries & name groups are shared, not rebuilt) and
+    the insert/update/delete counts.
+
+    The new index equals build_cache_index(loc_data).
+    The resident index is never modified.
+    """
+
+    old_ids = index['ids']
+    new_ids = {}
+
+    # Entry for each location (same order as loc_data).
+    entries = []
+
+    # Lowercase names whose group must be rebuilt.
+    touched = set()
+    counts = {'inserted': 0, 'updated': 0, 'deleted': 0}
+
+    for loc in loc_data:
+        old = old_ids.get(loc['id'])
+
+        # Unchanged -> reuse existing entry.
+        if old is not None and old[0] == loc:
+            entry = old
+
+        # Inserted.
+        elif old is None:
+            entry = build_index_entry(loc)
+            counts['inserted'] += 1
+            touched.add(loc['name'].lower())
+
+        # Updated (renamed -> old group is touched too).
+        else:
+            entry = build_index_entry(loc)
+            counts['updated'] += 1
+            touched.add(loc['name'].lower())
+            touched.add(old[0]['name'].lower())
+
+        new_ids[loc['id']] = entry
+        entries.append(entry)
+
+    # Deleted -> old group is touched.
+    for loc_id in old_ids.keys() - new_ids.keys():
+        counts['deleted'] += 1
+        touched.add(old_ids[loc_id][0]['name'].lower())
+
+    # Rebuild only touched name groups, in loc_data order.
+    groups = {}
+
+    for entry in entries:
+        name = entry[0]['name'].lower()
+        if name in touched:
+            groups.setdefault(name, []).append(entry)
+
+    names = dict(index['names'])
+
+    for name in touched:
+        if name in groups:
+            names[name] = groups[name]
+        else:
+            names.pop(name, None)
+
+    return {'ids': new_ids, 'names': names}, counts
+
+
+def get_cache_index():
+    """
+    Returns the resident location index, reading
+    the local API cache on first use only.
+    """
+
+    global cache_index
+
+    if cache_index is None:
+
+        # Read-in JSON file:
+        fp = WAPI_CACHE_PATH
+        with open(fp, 'r', encoding='utf-8') as cache:
+            loc_data = json.load(cache)
+
+        cache_index = build_cache_index(loc_data)
+
+    return cache_index
+
+
+def reset_cache_index(index=None):
+    """
+    Swaps in a new resident location index (None ->
+    rebuilt from the API cache on next use) and
+    drops replies cached from the old one.
+    """
+
+    global cache_index
+
+    cache_index = index
+    build_query_reply.cache_clear()
+
+
 def package_results(filt_res):
     """
-    Collates results into easily printable
-    message format for main program to display.
+    Collates (location data, display string) results
+    into easily printable message format for main
+    program to display.
     """
 
     # Handle empty filter list.
@@ -99,26 +646,12 @@ def package_results(filt_res):
         length = len(filt_res)
         msg.append(length)
 
-        filt_res = filt_res[0]
+        loc_data, display = filt_res[0]
 
         # msg[3] -> raw location data
-        loc_data = filt_res
         msg.append(loc_data)
 
-        # NOTE: Can remove these abbr.
-        # Only using to match FLAKE8 style.
-
-        n = filt_res['name']
-        c = filt_res['country']
-
-        if filt_res['state']:
-
-            # Include state:
-            s = filt_res['state']
-            msg[1].append(f"[1]: {n}, {s}, ({c})")
-
-        else:
-            msg[1].append(f"[1]: {n}, ({c})")
+        msg[1].append(f"[1]: {display}")
 
     # Case 2: Multiple Matches:
     elif len(filt_res) > 1:
@@ -131,16 +664,12 @@ def package_results(filt_res):
         msg.append(length)
 
         # msg[3] -> raw location data
-        loc_data = filt_res
+        loc_data = [loc for loc, _ in filt_res]
         msg.append(loc_data)
 
         # Present first 3 matches.
-        for i, l in enumerate(filt_res[:3], 1):
-            full_loc = f"{l['name']}, ({l['country']})"
-
-            if l.get('state'):
-                full_loc = f"{l['name']}, {l['state']}, ({l['country']})"
-            msg[1].append(f"[{i}] {full_loc}")
+        for i, (_, display) in enumerate(filt_res[:3], 1):
+            msg[1].append(f"[{i}] {display}")
 
         if len(filt_res) > 3:
             msg[1].append("...")
@@ -148,18 +677,48 @@ def package_results(filt_res):
     return msg
 
 
-def handle_API_cache_query(query_type, msg_contents=[]):
+@lru_cache(maxsize=REPLY_CACHE_SIZE)
+def build_query_reply(name, country_code, state, encoding=None):
+    """
+    Filters the resident location index and returns
+    the pickled (optionally compressed) reply. Cached
+    so repeat queries are sent as-is without
+    re-filtering / re-packaging / re-compressing.
+    """
+
+    # Store filtered results.
+    filt_res = []
+
+    # Parse locations matching the city/town name.
+    for loc, display in get_cache_index()['names'].get(name, []):
+
+        # Filter mismatching countries.
+        if country_code and loc.get('country') != country_code:
+            continue
+        # Filter mismatching states.
+        if state and loc.get('state') != state:
+            continue
+
+        # Add matching results.
+        filt_res.append((loc, display))
+
+    # Send err if no loc found:
+    if not filt_res:
+        return pickle.dumps('error')
+
+    # Send [msg_type, organized_msg, length, loc_data] as msg
+    reply = pickle.dumps(package_results(filt_res))
+    return encode_reply(reply, encoding)
+
+
+def handle_API_cache_query(socket, query_type, msg_contents=[],
+                           encoding=None):
     """
     Handles location query requests.
     Parses local API cache and returns
     valid location options to user.
     """
 
-    # Connect to ZMQ comms pipe:
-    context = zmq.Context()
-    socket = context.socket(zmq.PUSH)
-    socket.bind("tcp://*:5556")
-
     # Prompt cache download.
     if query_type == 'cache_dl':
         res = download_wapi_cache()
@@ -168,12 +727,14 @@ def handle_API_cache_query(query_type, msg_contents=[]):
         if res == 'error':
             socket.send(pickle.dumps('error'))
         else:
+            # Rebuild index from the fresh cache on next query.
+            reset_cache_index()
+
             socket.send(pickle.dumps('success'))
 
-    # Read-in JSON file:
-    fp = 'weatherapi_cache/city.list.json'
-    with open(fp, 'r', encoding='utf-8') as cache:
-        loc_data = json.load(cache)
+    # Apply latest cache changes to the resident index.
+    if query_type == 'cache_refresh':
+        socket.send(pickle.dumps(start_cache_refresh()))
 
     # Handle ZIP input:
     if query_type == 'zip':
@@ -217,63 +778,80 @@ def handle_API_cache_query(query_type, msg_contents=[]):
         if not filters_dict['name']:
             filters_dict['name'] = msg_contents.lower()
 
-        # Store filtered results.
-        filt_res = []
-
-        # Parse Weather API Cache locations.
-        for loc in loc_data:
-
-            # Filter mismatching city/towns.
-            if loc.get('name').lower() != filters_dict['name']:
-                continue
-            # Filter mismatching countries.
-            if fd_country and loc.get('country') != fd_country:
-                continue
-            # Filter mismatching states.
-            if fd_state and loc.get('state') != fd_state:
-                continue
-
-            # Add matching results.
-            filt_res.append(loc)
-
-        # Send err if no loc found:
-        if not filt_res:
-            socket.send(pickle.dumps('error'))
-
-        # Send [msg_type, organized_msg, length, loc_data] as msg
-        else:
-            msg = package_results(filt_res)
-            socket.send(pickle.dumps(msg))
+        reply = build_query_reply(filters_dict['name'], fd_country, fd_state,
+                                  encoding)
+        socket.send(reply)
 
-    terminate_zmq(socket, context)
     return
 
 
 if __name__ == "__main__":
     context, socket = init_listener()
+    reply_context, reply_socket = init_sender()
+
+    # Bounded queue of admitted (not yet processed) requests.
+    work_queue = deque()
 
     while True:
 
-        # Receive user query.
-        uq = receive_user_query(socket)
+        # Block until a user query arrives (or profiling / refresh ends).
+        if not work_queue:
+            timeout = loop_poll_timeout()
+            if timeout is None:
+                print("!...Waiting for User Query...!")
+            socket.poll(timeout)
+
+        # Admit pending queries / shed overflow.
+        uq = admit_requests(socket, reply_socket, work_queue)
+
+        # Write profile stats once its window has elapsed.
+        finish_profile()
+
+        # Swap in a finished background cache refresh.
+        finish_cache_refresh()
 
         # Quit
         if uq == "Q":
+            terminate_zmq(reply_socket, reply_context)
             terminate_zmq(socket, context)
             break
 
+        if not work_queue:
+            continue
+
+        uq = work_queue.popleft()
+        service_stats['queue_depth'] = len(work_queue)
+
+        # Drop requests that expired while queued.
+        if request_expired(uq):
+            service_stats['shed_expired'] += 1
+            continue
+
         # Prompt cache download (if needed).
         if uq and isinstance(uq, list) and uq[0] == 'cache_dl':
-            handle_API_cache_query(uq[0])
+            handle_API_cache_query(reply_socket, uq[0])
+
+        # Refresh cache (delta update).
+        elif uq and isinstance(uq, list) and uq[0] == 'cache_refresh':
+            handle_API_cache_query(reply_socket, uq[0])
 
         # Check if initial query.
-        if uq and isinstance(uq, list) and uq[0] == "query":
-            handle_API_cache_query(uq[0], uq[1])
+        elif uq and isinstance(uq, list) and uq[0] == "query":
+            handle_API_cache_query(reply_socket, uq[0], uq[1],
+                                   reply_encoding(uq))
 
         # Check if filter query.
-        if uq and isinstance(uq, list) and uq[0] == "filter_query":
-            handle_API_cache_query(uq[0], uq[1])
+        elif uq and isinstance(uq, list) and uq[0] == "filter_query":
+            handle_API_cache_query(reply_socket, uq[0], uq[1],
+                                   reply_encoding(uq))
 
         # Check if zip query.
-        if uq and isinstance(uq, list) and uq[0] == "zip":
-            handle_API_cache_query(uq[0], uq[1])
+        elif uq and isinstance(uq, list) and uq[0] == "zip":
+            handle_API_cache_query(reply_socket, uq[0], uq[1])
+
+        # Unknown query -> not served.
+        else:
+            print(f"!...Ignored unknown query {uq}...!")
+            continue
+
+        service_stats['served'] += 1